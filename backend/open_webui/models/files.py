@@ -1,11 +1,12 @@
 import logging
 import time
+from fnmatch import fnmatch
 from typing import Optional
 
 from open_webui.internal.db import Base, JSONField, get_db
 from open_webui.env import SRC_LOG_LEVELS
 from pydantic import BaseModel, ConfigDict
-from sqlalchemy import BigInteger, Column, String, Text, JSON
+from sqlalchemy import BigInteger, Column, String, Text, JSON, func
 
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MODELS"])
@@ -97,7 +98,66 @@ class FileForm(BaseModel):
     access_control: Optional[dict] = None
 
 
+# ASCII letters that Python's lower() also produces from a non-ASCII letter
+# ("\u0130".lower() is "i\u0307", "\u212a".lower() is "k"), while lower() in SQLite
+# leaves those letters unchanged
+_NON_ASCII_LOWER_TARGETS = "ik"
+
+
+def fnmatch_to_like(pattern: str) -> str:
+    # Translate a lowercased fnmatch pattern into a LIKE pattern matching a superset
+    # of the same names. Character classes, non-ASCII characters and the letters in
+    # _NON_ASCII_LOWER_TARGETS, which LIKE and lower() don't handle the same way on
+    # every database, become wildcards. Lowercasing can also change a name's length,
+    # so single character wildcards become % as well.
+    like = []
+
+    def wildcard():
+        if not like or like[-1] != "%":
+            like.append("%")
+
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        i += 1
+        if c in "*?":
+            wildcard()
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            j = pattern.find("]", j)
+            if j == -1:
+                like.append("[")
+            else:
+                wildcard()
+                i = j + 1
+        elif not c.isascii() or c in _NON_ASCII_LOWER_TARGETS:
+            wildcard()
+        elif c in "%_\\":
+            like.append("\\" + c)
+        else:
+            like.append(c)
+    return "".join(like)
+
+
 class FilesTable:
+    def _get_files_query(self, db, include_content: bool = True):
+        if include_content:
+            return db.query(File)
+
+        # Leave out the data column, which holds the extracted file content
+        return db.query(
+            *[column for column in File.__table__.columns if column.name != "data"]
+        )
+
+    def _to_file_model(self, file, include_content: bool = True) -> FileModel:
+        if include_content:
+            return FileModel.model_validate(file)
+        return FileModel.model_validate({**file._mapping, "data": {}})
+
     def insert_new_file(self, user_id: str, form_data: FileForm) -> Optional[FileModel]:
         with get_db() as db:
             file = FileModel(
@@ -143,9 +203,12 @@ class FilesTable:
             except Exception:
                 return None
 
-    def get_files(self) -> list[FileModel]:
+    def get_files(self, include_content: bool = True) -> list[FileModel]:
         with get_db() as db:
-            return [FileModel.model_validate(file) for file in db.query(File).all()]
+            return [
+                self._to_file_model(file, include_content)
+                for file in self._get_files_query(db, include_content).all()
+            ]
 
     def get_files_by_ids(self, ids: list[str]) -> list[FileModel]:
         with get_db() as db:
@@ -172,29 +235,61 @@ class FilesTable:
                 .all()
             ]
 
-    def get_files_by_user_id(self, user_id: str) -> list[FileModel]:
+    def get_files_by_user_id(
+        self, user_id: str, include_content: bool = True
+    ) -> list[FileModel]:
         with get_db() as db:
             return [
-                FileModel.model_validate(file)
-                for file in db.query(File).filter_by(user_id=user_id).all()
+                self._to_file_model(file, include_content)
+                for file in self._get_files_query(db, include_content)
+                .filter(File.user_id == user_id)
+                .all()
             ]
 
-    def update_file_hash_by_id(self, id: str, hash: str) -> Optional[FileModel]:
+    def _search_files(
+        self, query, filename: str, include_content: bool = True
+    ) -> list[FileModel]:
+        # Let the database narrow the rows down, then apply the exact fnmatch check
+        pattern = filename.lower()
+        files = query.filter(
+            func.lower(File.filename).like(fnmatch_to_like(pattern), escape="\\")
+        ).all()
+        return [
+            self._to_file_model(file, include_content)
+            for file in files
+            if fnmatch(file.filename.lower(), pattern)
+        ]
+
+    def search_files(
+        self, filename: str, include_content: bool = True
+    ) -> list[FileModel]:
         with get_db() as db:
-            try:
-                file = db.query(File).filter_by(id=id).first()
-                file.hash = hash
-                db.commit()
+            return self._search_files(
+                self._get_files_query(db, include_content), filename, include_content
+            )
 
-                return FileModel.model_validate(file)
-            except Exception:
-                return None
+    def search_files_by_user_id(
+        self, user_id: str, filename: str, include_content: bool = True
+    ) -> list[FileModel]:
+        with get_db() as db:
+            return self._search_files(
+                self._get_files_query(db, include_content).filter(
+                    File.user_id == user_id
+                ),
+                filename,
+                include_content,
+            )
 
-    def update_file_data_by_id(self, id: str, data: dict) -> Optional[FileModel]:
+    def update_file_data_by_id(
+        self, id: str, data: dict, hash: Optional[str] = None
+    ) -> Optional[FileModel]:
         with get_db() as db:
             try:
                 file = db.query(File).filter_by(id=id).first()
                 file.data = {**(file.data if file.data else {}), **data}
+                # Content and its hash change together, write them in one commit
+                if hash is not None:
+                    file.hash = hash
                 db.commit()
                 return FileModel.model_validate(file)
             except Exception as e:
@@ -154,6 +154,25 @@ class KnowledgeTable:
             or has_access(user_id, permission, knowledge_base.access_control)
         ]
 
+    def user_has_access(
+        self, user_id: str, knowledge_id: str, permission: str = "write"
+    ) -> bool:
+        try:
+            with get_db() as db:
+                knowledge = (
+                    db.query(Knowledge.user_id, Knowledge.access_control)
+                    .filter_by(id=knowledge_id)
+                    .first()
+                )
+                if not knowledge:
+                    return False
+                return knowledge.user_id == user_id or has_access(
+                    user_id, permission, knowledge.access_control
+                )
+        except Exception as e:
+            log.exception(f"Error checking access to knowledge {knowledge_id}: {e}")
+            return False
+
     def get_knowledge_by_id(self, id: str) -> Optional[KnowledgeModel]:
         try:
             with get_db() as db:
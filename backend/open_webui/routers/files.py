@@ -1,8 +1,13 @@
+import asyncio
 import logging
 import os
+import stat
+import threading
 import uuid
 import json
+from email.utils import formatdate
 from fnmatch import fnmatch
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from urllib.parse import quote
@@ -18,7 +23,8 @@ from fastapi import (
     status,
     Query,
 )
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from open_webui.constants import ERROR_MESSAGES
 from open_webui.env import SRC_LOG_LEVELS
 
@@ -51,9 +57,14 @@ router = APIRouter()
 
 
 def has_access_to_file(
-    file_id: Optional[str], access_type: str, user=Depends(get_verified_user)
+    file_id: Optional[str],
+    access_type: str,
+    user=Depends(get_verified_user),
+    file: Optional[FileModel] = None,
 ) -> bool:
-    file = Files.get_file_by_id(file_id)
+    # Callers that already loaded the file pass it in to skip a second lookup
+    if file is None:
+        file = Files.get_file_by_id(file_id)
     log.debug(f"Checking if user has {access_type} access to file")
 
     if not file:
@@ -62,19 +73,149 @@ def has_access_to_file(
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
-    has_access = False
     knowledge_base_id = file.meta.get("collection_name") if file.meta else None
 
     if knowledge_base_id:
-        knowledge_bases = Knowledges.get_knowledge_bases_by_user_id(
-            user.id, access_type
-        )
-        for knowledge_base in knowledge_bases:
-            if knowledge_base.id == knowledge_base_id:
-                has_access = True
-                break
+        return Knowledges.user_has_access(user.id, knowledge_base_id, access_type)
+
+    return False
+
+
+############################
+# Resolve the local path a stored file is served from
+############################
+
+
+# file id -> (storage path, updated_at, local path) of files already fetched from
+# storage. Remote providers download the object on every get_file call, so the
+# local copy is reused. This is safe because a stored object is never replaced
+# under the same path, and the file is fetched again whenever the cached local
+# copy fails to stat.
+LOCAL_FILE_PATHS_CACHE_SIZE = 1024
+_local_file_paths: dict[str, tuple[str, Optional[int], str]] = {}
+_local_file_paths_lock = threading.Lock()
+
+
+def _stat_file(file_path: Path) -> Optional[os.stat_result]:
+    try:
+        stat_result = file_path.stat()
+    except OSError:
+        return None
+    return stat_result if stat.S_ISREG(stat_result.st_mode) else None
+
+
+def _stat_cached_file(
+    file: FileModel,
+) -> tuple[Optional[Path], Optional[os.stat_result]]:
+    # The stat result is handed to FileResponse so it does not stat the file again
+    cached = _local_file_paths.get(file.id)
+    if cached is None or cached[:2] != (file.path, file.updated_at):
+        return None, None
+    file_path = Path(cached[2])
+    stat_result = _stat_file(file_path)
+    if stat_result is None:
+        return None, None
+    return file_path, stat_result
+
+
+def _fetch_file(file: FileModel) -> tuple[Optional[Path], Optional[os.stat_result]]:
+    file_path = Path(Storage.get_file(file.path))
+    stat_result = _stat_file(file_path)
+    if stat_result is None:
+        return None, None
+    with _local_file_paths_lock:
+        _local_file_paths[file.id] = (file.path, file.updated_at, str(file_path))
+        # Evict the oldest entries, dicts keep insertion order
+        while len(_local_file_paths) > LOCAL_FILE_PATHS_CACHE_SIZE:
+            del _local_file_paths[next(iter(_local_file_paths))]
+    return file_path, stat_result
+
+
+def _stat_or_fetch_file(
+    file: FileModel,
+) -> tuple[Optional[Path], Optional[os.stat_result]]:
+    # Another request may have fetched the file while this one waited for the lock
+    file_path, stat_result = _stat_cached_file(file)
+    if stat_result is None:
+        file_path, stat_result = _fetch_file(file)
+    return file_path, stat_result
+
+
+# Per-file locks so concurrent requests for the same file fetch it only once.
+# Each entry is [lock, number of requests holding or waiting for it].
+_file_path_locks: dict[str, list] = {}
+
+
+async def resolve_file_path(
+    file: FileModel,
+) -> tuple[Optional[Path], Optional[os.stat_result]]:
+    # Files with a valid local copy are served without the lock, so concurrent
+    # requests for a hot file still run in parallel
+    file_path, stat_result = await run_in_threadpool(_stat_cached_file, file)
+    if stat_result is not None:
+        return file_path, stat_result
+
+    entry = _file_path_locks.setdefault(file.id, [asyncio.Lock(), 0])
+    lock = entry[0]
+    entry[1] += 1
+    try:
+        async with lock:
+            return await run_in_threadpool(_stat_or_fetch_file, file)
+    finally:
+        entry[1] -= 1
+        # Only the last user of this lock removes it, and only if it is still ours
+        if entry[1] == 0 and _file_path_locks.get(file.id) is entry:
+            del _file_path_locks[file.id]
+
+
+############################
+# Content-Disposition headers for the content endpoints
+############################
+
+
+def get_encoded_filename(file: FileModel) -> str:
+    # Uploads store the RFC5987-encoded name in meta, older files are encoded here
+    filename = file.meta.get("name", file.filename)
+    return file.meta.get("encoded_filename") or quote(filename)
+
+
+# Content type -> (Content-Disposition type, media type override) for inline views.
+# A disposition type of None sends no header; unlisted types are downloaded.
+CONTENT_DISPOSITION_RULES = {
+    "application/pdf": ("inline", "application/pdf"),
+    "text/plain": (None, None),
+}
+
+
+@lru_cache(maxsize=4096)
+def get_content_disposition(disposition_type: str, encoded_filename: str) -> str:
+    return f"{disposition_type}; filename*=UTF-8''{encoded_filename}"
+
+
+############################
+# Conditional GET support for the content endpoints
+############################
+
+
+def get_file_cache_headers(file: FileModel, last_modified: bool = True) -> dict:
+    # The hash changes whenever the extracted content does, and the stored file
+    # itself is never replaced, so it is a safe validator for both endpoints.
+    # no-cache makes clients revalidate every time instead of guessing freshness.
+    etag = f'"{file.hash or f"{file.id}-{file.updated_at}"}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    # updated_at is the upload time, which only dates the stored file itself
+    if last_modified and file.updated_at:
+        headers["Last-Modified"] = formatdate(file.updated_at, usegmt=True)
+    return headers
+
 
-    return has_access
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
 
 
 ############################
@@ -83,7 +224,7 @@ def has_access_to_file(
 
 
 @router.post("/", response_model=FileModelResponse)
-def upload_file(
+async def upload_file(
     request: Request,
     file: UploadFile = File(...),
     metadata: Optional[dict | str] = Form(None),
@@ -134,9 +275,12 @@ def upload_file(
             "OpenWebUI-User-Name": user.name,
             "OpenWebUI-File-Id": id,
         }
-        contents, file_path = Storage.upload_file(file.file, filename, tags)
+        size, file_path = await run_in_threadpool(
+            Storage.upload_stream, file.file, filename, tags
+        )
 
-        file_item = Files.insert_new_file(
+        file_item = await run_in_threadpool(
+            Files.insert_new_file,
             user.id,
             FileForm(
                 **{
@@ -145,8 +289,9 @@ def upload_file(
                     "path": file_path,
                     "meta": {
                         "name": name,
+                        "encoded_filename": quote(name),  # RFC5987 encoding
                         "content_type": file.content_type,
-                        "size": len(contents),
+                        "size": size,
                         "data": file_metadata,
                     },
                 }
@@ -167,10 +312,13 @@ def upload_file(
                         fnmatch(file.content_type, content_type)
                         for content_type in stt_supported_content_types
                     ):
-                        file_path = Storage.get_file(file_path)
-                        result = transcribe(request, file_path, file_metadata)
+                        file_path = await run_in_threadpool(Storage.get_file, file_path)
+                        result = await run_in_threadpool(
+                            transcribe, request, file_path, file_metadata
+                        )
 
-                        process_file(
+                        await run_in_threadpool(
+                            process_file,
                             request,
                             ProcessFileForm(file_id=id, content=result.get("text", "")),
                             user=user,
@@ -178,14 +326,21 @@ def upload_file(
                     elif (not file.content_type.startswith(("image/", "video/"))) or (
                         request.app.state.config.CONTENT_EXTRACTION_ENGINE == "external"
                     ):
-                        process_file(request, ProcessFileForm(file_id=id), user=user)
+                        await run_in_threadpool(
+                            process_file,
+                            request,
+                            ProcessFileForm(file_id=id),
+                            user=user,
+                        )
                 else:
                     log.info(
                         f"File type {file.content_type} is not provided, but trying to process anyway"
                     )
-                    process_file(request, ProcessFileForm(file_id=id), user=user)
+                    await run_in_threadpool(
+                        process_file, request, ProcessFileForm(file_id=id), user=user
+                    )
 
-                file_item = Files.get_file_by_id(id=id)
+                file_item = await run_in_threadpool(Files.get_file_by_id, id)
             except Exception as e:
                 log.exception(e)
                 log.error(f"Error processing file: {file_item.id}")
@@ -220,14 +375,11 @@ def upload_file(
 @router.get("/", response_model=list[FileModelResponse])
 async def list_files(user=Depends(get_verified_user), content: bool = Query(True)):
     if user.role == "admin":
-        files = Files.get_files()
+        files = await run_in_threadpool(Files.get_files, include_content=content)
     else:
-        files = Files.get_files_by_user_id(user.id)
-
-    if not content:
-        for file in files:
-            if "content" in file.data:
-                del file.data["content"]
+        files = await run_in_threadpool(
+            Files.get_files_by_user_id, user.id, include_content=content
+        )
 
     return files
 
@@ -249,16 +401,15 @@ async def search_files(
     """
     Search for files by filename with support for wildcard patterns.
     """
-    # Get files according to user role
+    # Get matching files according to user role
     if user.role == "admin":
-        files = Files.get_files()
+        matching_files = await run_in_threadpool(
+            Files.search_files, filename, include_content=content
+        )
     else:
-        files = Files.get_files_by_user_id(user.id)
-
-    # Get matching files
-    matching_files = [
-        file for file in files if fnmatch(file.filename.lower(), filename.lower())
-    ]
+        matching_files = await run_in_threadpool(
+            Files.search_files_by_user_id, user.id, filename, include_content=content
+        )
 
     if not matching_files:
         raise HTTPException(
@@ -266,11 +417,6 @@ async def search_files(
             detail="No files found matching the pattern.",
         )
 
-    if not content:
-        for file in matching_files:
-            if "content" in file.data:
-                del file.data["content"]
-
     return matching_files
 
 
@@ -281,10 +427,10 @@ async def search_files(
 
 @router.delete("/all")
 async def delete_all_files(user=Depends(get_admin_user)):
-    result = Files.delete_all_files()
+    result = await run_in_threadpool(Files.delete_all_files)
     if result:
         try:
-            Storage.delete_all_files()
+            await run_in_threadpool(Storage.delete_all_files)
         except Exception as e:
             log.exception(e)
             log.error("Error deleting files")
@@ -307,7 +453,7 @@ async def delete_all_files(user=Depends(get_admin_user)):
 
 @router.get("/{id}", response_model=Optional[FileModel])
 async def get_file_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -318,7 +464,7 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "read", user)
+        or await run_in_threadpool(has_access_to_file, id, "read", user, file=file)
     ):
         return file
     else:
@@ -334,8 +480,10 @@ async def get_file_by_id(id: str, user=Depends(get_verified_user)):
 
 
 @router.get("/{id}/data/content")
-async def get_file_data_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+async def get_file_data_content_by_id(
+    request: Request, response: Response, id: str, user=Depends(get_verified_user)
+):
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -346,8 +494,16 @@ async def get_file_data_content_by_id(id: str, user=Depends(get_verified_user)):
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "read", user)
+        or await run_in_threadpool(has_access_to_file, id, "read", user, file=file)
     ):
+        # Content edits don't touch updated_at, so leave Last-Modified out here
+        cache_headers = get_file_cache_headers(file, last_modified=False)
+        if is_not_modified(request, cache_headers["ETag"]):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers
+            )
+
+        response.headers.update(cache_headers)
         return {"content": file.data.get("content", "")}
     else:
         raise HTTPException(
@@ -369,7 +525,7 @@ class ContentForm(BaseModel):
 async def update_file_data_content_by_id(
     request: Request, id: str, form_data: ContentForm, user=Depends(get_verified_user)
 ):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -380,15 +536,16 @@ async def update_file_data_content_by_id(
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "write", user)
+        or await run_in_threadpool(has_access_to_file, id, "write", user, file=file)
     ):
         try:
-            process_file(
+            await run_in_threadpool(
+                process_file,
                 request,
                 ProcessFileForm(file_id=id, content=form_data.content),
                 user=user,
             )
-            file = Files.get_file_by_id(id=id)
+            file = await run_in_threadpool(Files.get_file_by_id, id)
         except Exception as e:
             log.exception(e)
             log.error(f"Error processing file: {file.id}")
@@ -408,9 +565,12 @@ async def update_file_data_content_by_id(
 
 @router.get("/{id}/content")
 async def get_file_content_by_id(
-    id: str, user=Depends(get_verified_user), attachment: bool = Query(False)
+    request: Request,
+    id: str,
+    user=Depends(get_verified_user),
+    attachment: bool = Query(False),
 ):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -421,41 +581,51 @@ async def get_file_content_by_id(
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "read", user)
+        or await run_in_threadpool(has_access_to_file, id, "read", user, file=file)
     ):
+        cache_headers = get_file_cache_headers(file)
+        if is_not_modified(request, cache_headers["ETag"]):
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers
+            )
+
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
+            file_path, stat_result = await resolve_file_path(file)
 
             # Check if the file already exists in the cache
-            if file_path.is_file():
+            if file_path:
                 # Handle Unicode filenames
                 filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)  # RFC5987 encoding
+                encoded_filename = get_encoded_filename(file)
 
                 content_type = file.meta.get("content_type")
-                filename = file.meta.get("name", file.filename)
-                encoded_filename = quote(filename)
-                headers = {}
+                headers = {**cache_headers}
 
                 if attachment:
-                    headers["Content-Disposition"] = (
-                        f"attachment; filename*=UTF-8''{encoded_filename}"
-                    )
+                    disposition_type = "attachment"
                 else:
-                    if content_type == "application/pdf" or filename.lower().endswith(
-                        ".pdf"
-                    ):
-                        headers["Content-Disposition"] = (
-                            f"inline; filename*=UTF-8''{encoded_filename}"
-                        )
-                        content_type = "application/pdf"
-                    elif content_type != "text/plain":
-                        headers["Content-Disposition"] = (
-                            f"attachment; filename*=UTF-8''{encoded_filename}"
-                        )
+                    # Files named *.pdf are shown as PDFs whatever their stored type
+                    rule = (
+                        "application/pdf"
+                        if filename.lower().endswith(".pdf")
+                        else content_type
+                    )
+                    disposition_type, media_type = CONTENT_DISPOSITION_RULES.get(
+                        rule, ("attachment", None)
+                    )
+                    content_type = media_type or content_type
 
-                return FileResponse(file_path, headers=headers, media_type=content_type)
+                if disposition_type:
+                    headers["Content-Disposition"] = get_content_disposition(
+                        disposition_type, encoded_filename
+                    )
+
+                return FileResponse(
+                    file_path,
+                    headers=headers,
+                    media_type=content_type,
+                    stat_result=stat_result,
+                )
 
             else:
                 raise HTTPException(
@@ -478,7 +648,7 @@ async def get_file_content_by_id(
 
 @router.get("/{id}/content/html")
 async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -486,7 +656,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
             detail=ERROR_MESSAGES.NOT_FOUND,
         )
 
-    file_user = Users.get_user_by_id(file.user_id)
+    file_user = await run_in_threadpool(Users.get_user_by_id, file.user_id)
     if not file_user.role == "admin":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -496,16 +666,15 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "read", user)
+        or await run_in_threadpool(has_access_to_file, id, "read", user, file=file)
     ):
         try:
-            file_path = Storage.get_file(file.path)
-            file_path = Path(file_path)
+            file_path, stat_result = await resolve_file_path(file)
 
             # Check if the file already exists in the cache
-            if file_path.is_file():
+            if file_path:
                 log.info(f"file_path: {file_path}")
-                return FileResponse(file_path)
+                return FileResponse(file_path, stat_result=stat_result)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -527,7 +696,7 @@ async def get_html_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.get("/{id}/content/{file_name}")
 async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -538,24 +707,23 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "read", user)
+        or await run_in_threadpool(has_access_to_file, id, "read", user, file=file)
     ):
         file_path = file.path
 
         # Handle Unicode filenames
-        filename = file.meta.get("name", file.filename)
-        encoded_filename = quote(filename)  # RFC5987 encoding
         headers = {
-            "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}"
+            "Content-Disposition": get_content_disposition(
+                "attachment", get_encoded_filename(file)
+            )
         }
 
         if file_path:
-            file_path = Storage.get_file(file_path)
-            file_path = Path(file_path)
+            file_path, stat_result = await resolve_file_path(file)
 
             # Check if the file already exists in the cache
-            if file_path.is_file():
-                return FileResponse(file_path, headers=headers)
+            if file_path:
+                return FileResponse(file_path, headers=headers, stat_result=stat_result)
             else:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -589,7 +757,7 @@ async def get_file_content_by_id(id: str, user=Depends(get_verified_user)):
 
 @router.delete("/{id}")
 async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
-    file = Files.get_file_by_id(id)
+    file = await run_in_threadpool(Files.get_file_by_id, id)
 
     if not file:
         raise HTTPException(
@@ -600,14 +768,14 @@ async def delete_file_by_id(id: str, user=Depends(get_verified_user)):
     if (
         file.user_id == user.id
         or user.role == "admin"
-        or has_access_to_file(id, "write", user)
+        or await run_in_threadpool(has_access_to_file, id, "write", user, file=file)
     ):
         # We should add Chroma cleanup here
 
-        result = Files.delete_file_by_id(id)
+        result = await run_in_threadpool(Files.delete_file_by_id, id)
         if result:
             try:
-                Storage.delete_file(file.path)
+                await run_in_threadpool(Storage.delete_file, file.path)
             except Exception as e:
                 log.exception(e)
                 log.error("Error deleting files")
@@ -451,7 +451,7 @@ def load_url_image_data(url, headers=None):
         return None
 
 
-def upload_image(request, image_data, content_type, metadata, user):
+async def upload_image(request, image_data, content_type, metadata, user):
     image_format = mimetypes.guess_extension(content_type)
     file = UploadFile(
         file=io.BytesIO(image_data),
@@ -460,7 +460,9 @@ def upload_image(request, image_data, content_type, metadata, user):
             "content-type": content_type,
         },
     )
-    file_item = upload_file(request, file, metadata=metadata, internal=True, user=user)
+    file_item = await upload_file(
+        request, file, metadata=metadata, internal=True, user=user
+    )
     url = request.app.url_path_for("get_file_content_by_id", id=file_item.id)
     return url
 
@@ -527,7 +529,7 @@ async def image_generations(
                 else:
                     image_data, content_type = load_b64_image_data(image["b64_json"])
 
-                url = upload_image(request, image_data, content_type, data, user)
+                url = await upload_image(request, image_data, content_type, data, user)
                 images.append({"url": url})
             return images
 
@@ -561,7 +563,7 @@ async def image_generations(
                 image_data, content_type = load_b64_image_data(
                     image["bytesBase64Encoded"]
                 )
-                url = upload_image(request, image_data, content_type, data, user)
+                url = await upload_image(request, image_data, content_type, data, user)
                 images.append({"url": url})
 
             return images
@@ -610,7 +612,7 @@ async def image_generations(
                     }
 
                 image_data, content_type = load_url_image_data(image["url"], headers)
-                url = upload_image(
+                url = await upload_image(
                     request,
                     image_data,
                     content_type,
@@ -663,7 +665,7 @@ async def image_generations(
 
             for image in res["images"]:
                 image_data, content_type = load_b64_image_data(image)
-                url = upload_image(
+                url = await upload_image(
                     request,
                     image_data,
                     content_type,
@@ -1406,14 +1406,13 @@ def process_file(
             text_content = " ".join([doc.page_content for doc in docs])
 
         log.debug(f"text_content: {text_content}")
+        hash = calculate_sha256_string(text_content)
         Files.update_file_data_by_id(
             file.id,
             {"content": text_content},
+            hash=hash,
         )
 
-        hash = calculate_sha256_string(text_content)
-        Files.update_file_hash_by_id(file.id, hash)
-
         if not request.app.state.config.BYPASS_EMBEDDING_AND_RETRIEVAL:
             try:
                 result = save_docs_to_vector_db(
@@ -2187,8 +2186,7 @@ def process_files_batch(
             ]
 
             hash = calculate_sha256_string(text_content)
-            Files.update_file_hash_by_id(file.id, hash)
-            Files.update_file_data_by_id(file.id, {"content": text_content})
+            Files.update_file_data_by_id(file.id, {"content": text_content}, hash=hash)
 
             all_docs.extend(docs)
             results.append(BatchProcessFilesResult(file_id=file.id, status="prepared"))
@@ -39,6 +39,13 @@ from open_webui.env import SRC_LOG_LEVELS
 log = logging.getLogger(__name__)
 log.setLevel(SRC_LOG_LEVELS["MAIN"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# Maximum number of deletes a single batch request accepts, Cloud Storage
+# documents 100 calls per batch, Azure Blob Storage 256 subrequests
+GCS_DELETE_BATCH_SIZE = 100
+AZURE_DELETE_BATCH_SIZE = 256
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -46,9 +53,9 @@ class StorageProvider(ABC):
         pass
 
     @abstractmethod
-    def upload_file(
+    def upload_stream(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[int, str]:
         pass
 
     @abstractmethod
@@ -62,16 +69,27 @@ class StorageProvider(ABC):
 
 class LocalStorageProvider(StorageProvider):
     @staticmethod
-    def upload_file(
+    def upload_stream(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[int, str]:
+        """Copies the file to local storage in chunks without reading it into memory."""
         file_path = f"{UPLOAD_DIR}/{filename}"
+        size = 0
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            if hasattr(file, "readinto"):
+                # Reuse a single buffer so memory stays at one chunk per upload
+                with memoryview(bytearray(UPLOAD_CHUNK_SIZE)) as buffer:
+                    while n := file.readinto(buffer):
+                        f.write(buffer[:n])
+                        size += n
+            else:
+                while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return size, file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -142,11 +160,11 @@ class S3StorageProvider(StorageProvider):
         """Only include S3 allowed characters."""
         return re.sub(r"[^a-zA-Z0-9 äöüÄÖÜß\+\-=\._:/@]", "", s)
 
-    def upload_file(
+    def upload_stream(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+    ) -> Tuple[int, str]:
+        """Handles uploading of the file to S3 storage without reading it into memory."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
             self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
@@ -165,10 +183,7 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            return size, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -195,19 +210,32 @@ class S3StorageProvider(StorageProvider):
 
     def delete_all_files(self) -> None:
         """Handles deletion of all files from S3 storage."""
+        failed_keys = []
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
-            if "Contents" in response:
-                for content in response["Contents"]:
-                    # Skip objects that were not uploaded from open-webui in the first place
-                    if not content["Key"].startswith(self.key_prefix):
-                        continue
-
-                    self.s3_client.delete_object(
-                        Bucket=self.bucket_name, Key=content["Key"]
+            paginator = self.s3_client.get_paginator("list_objects_v2")
+            # Only list objects under our prefix, the rest were not uploaded from open-webui.
+            # Each page holds at most 1000 keys, the limit of a single DeleteObjects call.
+            for page in paginator.paginate(
+                Bucket=self.bucket_name, Prefix=self.key_prefix
+            ):
+                objects = [
+                    {"Key": content["Key"]} for content in page.get("Contents", [])
+                ]
+                if objects:
+                    response = self.s3_client.delete_objects(
+                        Bucket=self.bucket_name,
+                        Delete={"Objects": objects, "Quiet": True},
+                    )
+                    # DeleteObjects reports keys it could not delete instead of raising
+                    failed_keys.extend(
+                        error["Key"] for error in response.get("Errors", [])
                     )
         except ClientError as e:
             raise RuntimeError(f"Error deleting all files from S3: {e}")
+        if failed_keys:
+            raise RuntimeError(
+                f"Error deleting all files from S3: failed to delete {', '.join(failed_keys)}"
+            )
 
         # Always delete from local storage
         LocalStorageProvider.delete_all_files()
@@ -235,15 +263,15 @@ class GCSStorageProvider(StorageProvider):
             self.gcs_client = storage.Client()
         self.bucket = self.gcs_client.bucket(GCS_BUCKET_NAME)
 
-    def upload_file(
+    def upload_stream(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+    ) -> Tuple[int, str]:
+        """Handles uploading of the file to GCS storage without reading it into memory."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
         try:
             blob = self.bucket.blob(filename)
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            return size, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -274,10 +302,11 @@ class GCSStorageProvider(StorageProvider):
     def delete_all_files(self) -> None:
         """Handles deletion of all files from GCS storage."""
         try:
-            blobs = self.bucket.list_blobs()
-
-            for blob in blobs:
-                blob.delete()
+            # Each page is deleted with one batch request instead of a call per blob
+            for page in self.bucket.list_blobs(page_size=GCS_DELETE_BATCH_SIZE).pages:
+                with self.gcs_client.batch():
+                    for blob in page:
+                        blob.delete()
 
         except NotFound as e:
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
@@ -307,15 +336,16 @@ class AzureStorageProvider(StorageProvider):
             self.container_name
         )
 
-    def upload_file(
+    def upload_stream(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+    ) -> Tuple[int, str]:
+        """Handles uploading of the file to Azure Blob Storage without reading it into memory."""
+        size, file_path = LocalStorageProvider.upload_stream(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            with open(file_path, "rb") as data:
+                blob_client.upload_blob(data, length=size, overwrite=True)
+            return size, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -346,9 +376,13 @@ class AzureStorageProvider(StorageProvider):
     def delete_all_files(self) -> None:
         """Handles deletion of all files from Azure Blob Storage."""
         try:
-            blobs = self.container_client.list_blobs()
-            for blob in blobs:
-                self.container_client.delete_blob(blob.name)
+            # Delete in batches, a single batch request holds at most 256 blobs
+            for page in self.container_client.list_blobs(
+                results_per_page=AZURE_DELETE_BATCH_SIZE
+            ).by_page():
+                blob_names = [blob.name for blob in page]
+                if blob_names:
+                    self.container_client.delete_blobs(*blob_names)
         except Exception as e:
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def migrated_db():
+    # The app migrates the database on startup, these tests use it directly
+    from open_webui.config import run_migrations
+
+    run_migrations()
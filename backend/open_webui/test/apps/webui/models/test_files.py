@@ -0,0 +1,123 @@
+import sqlite3
+import uuid
+from fnmatch import fnmatch
+
+import pytest
+from open_webui.models.files import FileForm, Files, fnmatch_to_like
+
+
+@pytest.mark.parametrize(
+    "pattern, like",
+    [
+        ("*.txt", "%.txt"),
+        ("?.txt", "%.txt"),
+        ("100%_\\*", "100\\%\\_\\\\%"),
+        ("x[[]1].md", "x%1].md"),
+        ("[]]x", "%x"),
+        ("[!a]*", "%"),
+        ("*[", "%["),
+        ("ärger.doc", "%rger.doc"),
+        ("i*", "%"),
+        ("kelvin.txt", "%elv%n.txt"),
+    ],
+)
+def test_fnmatch_to_like(pattern, like):
+    assert fnmatch_to_like(pattern) == like
+
+
+def test_fnmatch_to_like_matches_superset():
+    names = [
+        "a.txt",
+        "a_b.txt",
+        "100%.pdf",
+        "x[1].md",
+        "ärger.doc",
+        "Ärger.doc",
+        "back\\slash",
+        "abc",
+        "B.TXT",
+        "]x",
+        "İstanbul.pdf",
+        "Kelvin.txt",
+    ]
+    patterns = [
+        "*.txt",
+        "a_*",
+        "*%*",
+        "x[[]1].md",
+        "ä*",
+        "*\\*",
+        "[ab]*",
+        "?.txt",
+        "[!a]*",
+        "*[",
+        "[]]x",
+        "i*",
+        "??stanbul.pdf",
+        "*stanbul.pdf",
+        "k*",
+        "kelvin.txt",
+        "[k]elvin.txt",
+    ]
+    db = sqlite3.connect(":memory:")
+    # Mirrors FilesTable._search_files: SQLite lower() on the name, Python lower() on the pattern
+    for pattern in map(str.lower, patterns):
+        like = fnmatch_to_like(pattern)
+        for name in names:
+            if fnmatch(name.lower(), pattern):
+                (matched,) = db.execute(
+                    "SELECT lower(?) LIKE ? ESCAPE '\\'", (name, like)
+                ).fetchone()
+                assert matched, (pattern, like, name)
+
+
+@pytest.fixture
+def files(migrated_db):
+    user_id = str(uuid.uuid4())
+    inserted = [
+        Files.insert_new_file(
+            owner,
+            FileForm(
+                id=str(uuid.uuid4()),
+                hash=f"hash-{i}",
+                filename=f"file-{i}.txt",
+                path=f"/uploads/file-{i}.txt",
+                data={"content": f"content {i}"},
+                meta={"name": f"file-{i}.txt"},
+                access_control={"read": {"user_ids": [user_id]}},
+            ),
+        )
+        for i, owner in enumerate([user_id, user_id, str(uuid.uuid4())])
+    ]
+    yield user_id, inserted
+    for file in inserted:
+        Files.delete_file_by_id(file.id)
+
+
+def _without_data(file):
+    return file.model_dump(exclude={"data"})
+
+
+def test_get_files_without_content(files):
+    _, inserted = files
+    ids = {file.id for file in inserted}
+
+    result = [file for file in Files.get_files() if file.id in ids]
+    assert [file.data for file in result] == [file.data for file in inserted]
+
+    # Every column but data is loaded, data is replaced by an empty dict
+    result = [file for file in Files.get_files(include_content=False) if file.id in ids]
+    assert [file.data for file in result] == [{}, {}, {}]
+    assert [_without_data(file) for file in result] == [
+        _without_data(file) for file in inserted
+    ]
+
+
+def test_get_files_by_user_id_without_content(files):
+    user_id, inserted = files
+
+    result = Files.get_files_by_user_id(user_id, include_content=False)
+    assert [file.data for file in result] == [{}, {}]
+    assert [_without_data(file) for file in result] == [
+        _without_data(file) for file in inserted[:2]
+    ]
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from open_webui.models import knowledge
+from open_webui.models.knowledge import KnowledgeForm, Knowledges
+
+
+@pytest.fixture
+def insert_knowledge(migrated_db):
+    inserted = []
+
+    def insert(user_id, access_control):
+        item = Knowledges.insert_new_knowledge(
+            user_id,
+            KnowledgeForm(
+                name="knowledge",
+                description="",
+                access_control=access_control,
+            ),
+        )
+        inserted.append(item)
+        return item
+
+    yield insert
+    for item in inserted:
+        Knowledges.delete_knowledge_by_id(item.id)
+
+
+def test_user_has_access_owner(insert_knowledge):
+    owner_id = str(uuid.uuid4())
+    # Private to its owner
+    item = insert_knowledge(owner_id, {})
+
+    assert Knowledges.user_has_access(owner_id, item.id, "read")
+    assert Knowledges.user_has_access(owner_id, item.id, "write")
+    assert not Knowledges.user_has_access(str(uuid.uuid4()), item.id, "read")
+
+
+def test_user_has_access_access_control(insert_knowledge):
+    reader_id, writer_id = str(uuid.uuid4()), str(uuid.uuid4())
+    item = insert_knowledge(
+        str(uuid.uuid4()),
+        {
+            "read": {"user_ids": [reader_id, writer_id]},
+            "write": {"user_ids": [writer_id]},
+        },
+    )
+
+    assert Knowledges.user_has_access(reader_id, item.id, "read")
+    assert not Knowledges.user_has_access(reader_id, item.id, "write")
+    assert Knowledges.user_has_access(writer_id, item.id, "read")
+    assert Knowledges.user_has_access(writer_id, item.id, "write")
+    # Write is the default permission
+    assert not Knowledges.user_has_access(reader_id, item.id)
+
+
+def test_user_has_access_public(insert_knowledge):
+    # No access control means everyone can read, only the owner can write
+    item = insert_knowledge(str(uuid.uuid4()), None)
+    user_id = str(uuid.uuid4())
+
+    assert Knowledges.user_has_access(user_id, item.id, "read")
+    assert not Knowledges.user_has_access(user_id, item.id, "write")
+
+
+def test_user_has_access_missing_knowledge(migrated_db):
+    assert not Knowledges.user_has_access(str(uuid.uuid4()), str(uuid.uuid4()), "read")
+
+
+def test_user_has_access_logs_errors(monkeypatch, caplog):
+    def get_db():
+        raise RuntimeError("database is gone")
+
+    monkeypatch.setattr(knowledge, "get_db", get_db)
+
+    assert not Knowledges.user_has_access("user-id", "knowledge-id", "read")
+    assert "database is gone" in caplog.text
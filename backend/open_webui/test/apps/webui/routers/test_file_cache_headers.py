@@ -0,0 +1,72 @@
+import pytest
+from fastapi import Request
+from open_webui.models.files import FileModel
+from open_webui.routers.files import get_file_cache_headers, is_not_modified
+
+
+def _file(**kwargs):
+    return FileModel(
+        **{
+            "id": "file-id",
+            "user_id": "user-id",
+            "filename": "test.txt",
+            "created_at": 1700000000,
+            "updated_at": 1700000000,
+            **kwargs,
+        }
+    )
+
+
+def _request(**headers):
+    return Request(
+        {
+            "type": "http",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_get_file_cache_headers():
+    assert get_file_cache_headers(_file(hash="abc")) == {
+        "ETag": '"abc"',
+        "Cache-Control": "no-cache",
+        "Last-Modified": "Tue, 14 Nov 2023 22:13:20 GMT",
+    }
+
+
+def test_get_file_cache_headers_without_hash():
+    # Files without a hash fall back to their id and upload time
+    headers = get_file_cache_headers(_file())
+    assert headers["ETag"] == '"file-id-1700000000"'
+
+
+def test_get_file_cache_headers_without_last_modified():
+    assert get_file_cache_headers(_file(hash="abc"), last_modified=False) == {
+        "ETag": '"abc"',
+        "Cache-Control": "no-cache",
+    }
+    assert "Last-Modified" not in get_file_cache_headers(_file(updated_at=None))
+
+
+@pytest.mark.parametrize(
+    "if_none_match, not_modified",
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('"other"', False),
+        ("*", True),
+        (" * ", True),
+        ('W/"abc"', True),
+        ('"other", W/"abc"', True),
+        ('"other","abc"', True),
+        ('"other", "more"', False),
+        ("abc", False),
+    ],
+)
+def test_is_not_modified(if_none_match, not_modified):
+    headers = {} if if_none_match is None else {"if_none_match": if_none_match}
+    assert is_not_modified(_request(**headers), '"abc"') is not_modified
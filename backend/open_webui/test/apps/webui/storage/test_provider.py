@@ -8,7 +8,8 @@ from open_webui.storage import provider
 from gcp_storage_emulator.server import create_server
 from google.cloud import storage
 from azure.storage.blob import BlobServiceClient, ContainerClient, BlobClient
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+from unittest.mock import ANY, MagicMock, call
 
 
 def mock_upload_dir(monkeypatch, tmp_path):
@@ -19,6 +20,36 @@ def mock_upload_dir(monkeypatch, tmp_path):
     return directory
 
 
+def mock_s3_storage(monkeypatch):
+    """Create an S3StorageProvider for a moto-mocked bucket."""
+    monkeypatch.setattr(provider, "S3_REGION_NAME", "us-east-1")
+    monkeypatch.setattr(provider, "S3_ENDPOINT_URL", None)
+    monkeypatch.setattr(provider, "S3_KEY_PREFIX", "")
+    Storage = provider.S3StorageProvider()
+    Storage.bucket_name = "my-bucket"
+    Storage.s3_client.create_bucket(Bucket=Storage.bucket_name)
+    return Storage
+
+
+def mock_gcs_storage(monkeypatch):
+    """Create a GCSStorageProvider backed by a mocked GCS client."""
+    monkeypatch.setattr(provider, "GOOGLE_APPLICATION_CREDENTIALS_JSON", None)
+    monkeypatch.setattr(provider, "GCS_BUCKET_NAME", "my-bucket")
+    monkeypatch.setattr(provider.storage, "Client", MagicMock())
+    return provider.GCSStorageProvider()
+
+
+def mock_azure_storage(monkeypatch):
+    """Create an AzureStorageProvider backed by a mocked blob service client."""
+    monkeypatch.setattr(
+        provider, "AZURE_STORAGE_ENDPOINT", "https://myaccount.blob.core.windows.net"
+    )
+    monkeypatch.setattr(provider, "AZURE_STORAGE_CONTAINER_NAME", "my-container")
+    monkeypatch.setattr(provider, "AZURE_STORAGE_KEY", "key")
+    monkeypatch.setattr(provider, "BlobServiceClient", MagicMock())
+    return provider.AzureStorageProvider()
+
+
 def test_imports():
     provider.StorageProvider
     provider.LocalStorageProvider
@@ -64,15 +95,17 @@ class TestLocalStorageProvider:
     filename_extra = "test_exyta.txt"
     file_bytesio_empty = io.BytesIO()
 
-    def test_upload_file(self, monkeypatch, tmp_path):
+    def test_upload_stream(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, file_path = self.Storage.upload_file(self.file_bytesio, self.filename)
-        assert (upload_dir / self.filename).exists()
+        size, file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
+        )
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert file_path == str(upload_dir / self.filename)
         with pytest.raises(ValueError):
-            self.Storage.upload_file(self.file_bytesio_empty, self.filename)
+            self.Storage.upload_stream(io.BytesIO(), self.filename_extra, {})
+        assert not (upload_dir / self.filename_extra).exists()
 
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
@@ -110,30 +143,30 @@ class TestS3StorageProvider:
         self.file_bytesio_empty = io.BytesIO()
         super().__init__()
 
-    def test_upload_file(self, monkeypatch, tmp_path):
+    def test_upload_stream(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         # S3 checks
         with pytest.raises(Exception):
-            self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+            self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, s3_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
         assert self.file_content == object.get()["Body"].read()
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert s3_file_path == "s3://" + self.Storage.bucket_name + "/" + self.filename
         with pytest.raises(ValueError):
-            self.Storage.upload_file(self.file_bytesio_empty, self.filename)
+            self.Storage.upload_stream(self.file_bytesio_empty, self.filename, {})
 
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, s3_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         file_path = self.Storage.get_file(s3_file_path)
         assert file_path == str(upload_dir / self.filename)
@@ -142,8 +175,8 @@ class TestS3StorageProvider:
     def test_delete_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        contents, s3_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, s3_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         assert (upload_dir / self.filename).exists()
         self.Storage.delete_file(s3_file_path)
@@ -158,12 +191,14 @@ class TestS3StorageProvider:
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         # create 2 files
         self.s3_client.create_bucket(Bucket=self.Storage.bucket_name)
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+        self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename)
         assert self.file_content == object.get()["Body"].read()
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename_extra)
+        self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename_extra, {}
+        )
         object = self.s3_client.Object(self.Storage.bucket_name, self.filename_extra)
         assert self.file_content == object.get()["Body"].read()
         assert (upload_dir / self.filename).exists()
@@ -223,30 +258,30 @@ class TestGCSStorageProvider:
         bucket.delete(force=True)
         server.stop()
 
-    def test_upload_file(self, monkeypatch, tmp_path, setup):
+    def test_upload_stream(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         # catch error if bucket does not exist
         with pytest.raises(Exception):
             self.Storage.bucket = monkeypatch(self.Storage, "bucket", None)
-            self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        contents, gcs_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+            self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
+        size, gcs_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         object = self.Storage.bucket.get_blob(self.filename)
         assert self.file_content == object.download_as_bytes()
         # local checks
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert gcs_file_path == "gs://" + self.Storage.bucket_name + "/" + self.filename
         # test error if file is empty
         with pytest.raises(ValueError):
-            self.Storage.upload_file(self.file_bytesio_empty, self.filename)
+            self.Storage.upload_stream(self.file_bytesio_empty, self.filename, {})
 
     def test_get_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, gcs_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         file_path = self.Storage.get_file(gcs_file_path)
         assert file_path == str(upload_dir / self.filename)
@@ -254,8 +289,8 @@ class TestGCSStorageProvider:
 
     def test_delete_file(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
-        contents, gcs_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, gcs_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
         # ensure that local directory has the uploaded file as well
         assert (upload_dir / self.filename).exists()
@@ -268,13 +303,15 @@ class TestGCSStorageProvider:
     def test_delete_all_files(self, monkeypatch, tmp_path, setup):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         # create 2 files
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+        self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
         object = self.Storage.bucket.get_blob(self.filename)
         assert (upload_dir / self.filename).exists()
         assert (upload_dir / self.filename).read_bytes() == self.file_content
         assert self.Storage.bucket.get_blob(self.filename).name == self.filename
         assert self.file_content == object.download_as_bytes()
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename_extra)
+        self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename_extra, {}
+        )
         object = self.Storage.bucket.get_blob(self.filename_extra)
         assert (upload_dir / self.filename_extra).exists()
         assert (upload_dir / self.filename_extra).read_bytes() == self.file_content
@@ -335,7 +372,7 @@ class TestAzureStorageProvider:
         self.Storage.blob_service_client = mock_blob_service_client
         self.Storage.container_client = mock_container_client
 
-    def test_upload_file(self, monkeypatch, tmp_path):
+    def test_upload_stream(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
 
         # Simulate an error when container does not exist
@@ -343,21 +380,21 @@ class TestAzureStorageProvider:
             "Container does not exist"
         )
         with pytest.raises(Exception):
-            self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+            self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
 
         # Reset side effect and create container
         self.Storage.container_client.get_blob_client.side_effect = None
         self.Storage.create_container()
-        contents, azure_file_path = self.Storage.upload_file(
-            io.BytesIO(self.file_content), self.filename
+        size, azure_file_path = self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename, {}
         )
 
         # Assertions
         self.Storage.container_client.get_blob_client.assert_called_with(self.filename)
         self.Storage.container_client.get_blob_client().upload_blob.assert_called_once_with(
-            self.file_content, overwrite=True
+            ANY, length=len(self.file_content), overwrite=True
         )
-        assert contents == self.file_content
+        assert size == len(self.file_content)
         assert (
             azure_file_path
             == f"https://myaccount.blob.core.windows.net/{self.Storage.container_name}/{self.filename}"
@@ -366,14 +403,14 @@ class TestAzureStorageProvider:
         assert (upload_dir / self.filename).read_bytes() == self.file_content
 
         with pytest.raises(ValueError):
-            self.Storage.upload_file(self.file_bytesio_empty, self.filename)
+            self.Storage.upload_stream(self.file_bytesio_empty, self.filename, {})
 
     def test_get_file(self, monkeypatch, tmp_path):
         upload_dir = mock_upload_dir(monkeypatch, tmp_path)
         self.Storage.create_container()
 
         # Mock upload behavior
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+        self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
         # Mock blob download behavior
         self.Storage.container_client.get_blob_client().download_blob().readall.return_value = (
             self.file_content
@@ -391,7 +428,7 @@ class TestAzureStorageProvider:
         self.Storage.create_container()
 
         # Mock file upload
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
+        self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
         # Mock deletion
         self.Storage.container_client.get_blob_client().delete_blob.return_value = None
 
@@ -406,8 +443,10 @@ class TestAzureStorageProvider:
         self.Storage.create_container()
 
         # Mock file uploads
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename)
-        self.Storage.upload_file(io.BytesIO(self.file_content), self.filename_extra)
+        self.Storage.upload_stream(io.BytesIO(self.file_content), self.filename, {})
+        self.Storage.upload_stream(
+            io.BytesIO(self.file_content), self.filename_extra, {}
+        )
 
         # Mock listing and deletion behavior
         self.Storage.container_client.list_blobs.return_value = [
@@ -433,3 +472,153 @@ class TestAzureStorageProvider:
         )
         with pytest.raises(Exception, match="Blob not found"):
             self.Storage.get_file(file_url)
+
+
+@mock_aws
+def test_s3_upload_stream(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    Storage = mock_s3_storage(monkeypatch)
+    file_content = b"test content"
+
+    size, s3_file_path = Storage.upload_stream(io.BytesIO(file_content), "test.txt", {})
+    object = Storage.s3_client.get_object(Bucket=Storage.bucket_name, Key="test.txt")
+    assert object["Body"].read() == file_content
+    assert (upload_dir / "test.txt").read_bytes() == file_content
+    assert size == len(file_content)
+    assert s3_file_path == "s3://my-bucket/test.txt"
+    with pytest.raises(ValueError):
+        Storage.upload_stream(io.BytesIO(), "test_empty.txt", {})
+
+
+def test_gcs_upload_stream(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    Storage = mock_gcs_storage(monkeypatch)
+    file_content = b"test content"
+
+    size, gcs_file_path = Storage.upload_stream(
+        io.BytesIO(file_content), "test.txt", {}
+    )
+    Storage.bucket.blob.assert_called_with("test.txt")
+    Storage.bucket.blob.return_value.upload_from_filename.assert_called_once_with(
+        str(upload_dir / "test.txt")
+    )
+    assert (upload_dir / "test.txt").read_bytes() == file_content
+    assert size == len(file_content)
+    assert gcs_file_path == "gs://my-bucket/test.txt"
+
+
+def test_azure_upload_stream(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    Storage = mock_azure_storage(monkeypatch)
+    file_content = b"test content"
+
+    # The blob client receives a file handle, record what is read from it
+    uploaded = {}
+    blob_client = Storage.container_client.get_blob_client.return_value
+    blob_client.upload_blob.side_effect = lambda data, **kwargs: uploaded.update(
+        data=data.read(), **kwargs
+    )
+
+    size, azure_file_path = Storage.upload_stream(
+        io.BytesIO(file_content), "test.txt", {}
+    )
+    Storage.container_client.get_blob_client.assert_called_with("test.txt")
+    assert uploaded == {
+        "data": file_content,
+        "length": len(file_content),
+        "overwrite": True,
+    }
+    assert (upload_dir / "test.txt").read_bytes() == file_content
+    assert size == len(file_content)
+    assert (
+        azure_file_path
+        == "https://myaccount.blob.core.windows.net/my-container/test.txt"
+    )
+
+
+@mock_aws
+def test_s3_delete_all_files_batches(monkeypatch, tmp_path):
+    mock_upload_dir(monkeypatch, tmp_path)
+    Storage = mock_s3_storage(monkeypatch)
+    Storage.key_prefix = "open-webui/"
+    # More keys than a single listing page / DeleteObjects call holds
+    for i in range(1001):
+        Storage.s3_client.put_object(
+            Bucket=Storage.bucket_name, Key=f"open-webui/file-{i}.txt", Body=b"x"
+        )
+    Storage.s3_client.put_object(
+        Bucket=Storage.bucket_name, Key="other/file.txt", Body=b"x"
+    )
+
+    Storage.delete_all_files()
+
+    response = Storage.s3_client.list_objects_v2(Bucket=Storage.bucket_name)
+    assert [content["Key"] for content in response["Contents"]] == ["other/file.txt"]
+
+
+@mock_aws
+def test_s3_delete_all_files_reports_failed_keys(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    (upload_dir / "a.txt").write_bytes(b"x")
+    Storage = mock_s3_storage(monkeypatch)
+    for key in ["a.txt", "b.txt"]:
+        Storage.s3_client.put_object(Bucket=Storage.bucket_name, Key=key, Body=b"x")
+    # DeleteObjects returns per-key failures in the response instead of raising
+    monkeypatch.setattr(
+        Storage.s3_client,
+        "delete_objects",
+        MagicMock(
+            return_value={
+                "Errors": [
+                    {"Key": "b.txt", "Code": "AccessDenied", "Message": "Denied"}
+                ]
+            }
+        ),
+    )
+
+    with pytest.raises(RuntimeError, match="b.txt"):
+        Storage.delete_all_files()
+    # Local copies are kept alongside the objects that could not be deleted
+    assert (upload_dir / "a.txt").exists()
+
+
+def test_gcs_delete_all_files_batches(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    (upload_dir / "test.txt").write_bytes(b"test content")
+    Storage = mock_gcs_storage(monkeypatch)
+    pages = [[MagicMock(), MagicMock()], [MagicMock()]]
+    Storage.bucket.list_blobs.return_value.pages = pages
+
+    Storage.delete_all_files()
+
+    # Cloud Storage accepts at most 100 calls per batch request
+    Storage.bucket.list_blobs.assert_called_once_with(page_size=100)
+    # One batch request per page, every blob deleted inside it
+    assert Storage.gcs_client.batch.return_value.__enter__.call_count == len(pages)
+    for page in pages:
+        for blob in page:
+            blob.delete.assert_called_once_with()
+    assert not (upload_dir / "test.txt").exists()
+
+
+def test_azure_delete_all_files_batches(monkeypatch, tmp_path):
+    upload_dir = mock_upload_dir(monkeypatch, tmp_path)
+    (upload_dir / "test.txt").write_bytes(b"test content")
+    Storage = mock_azure_storage(monkeypatch)
+    Storage.container_client.list_blobs.return_value.by_page.return_value = [
+        [SimpleNamespace(name="a.txt"), SimpleNamespace(name="b.txt")],
+        [SimpleNamespace(name="c.txt")],
+        [],
+    ]
+
+    Storage.delete_all_files()
+
+    Storage.container_client.list_blobs.assert_called_once_with(
+        results_per_page=provider.AZURE_DELETE_BATCH_SIZE
+    )
+    # One delete_blobs call per non-empty page
+    assert Storage.container_client.delete_blobs.call_args_list == [
+        call("a.txt", "b.txt"),
+        call("c.txt"),
+    ]
+    assert not (upload_dir / "test.txt").exists()
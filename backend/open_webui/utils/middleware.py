@@ -2285,7 +2285,7 @@ async def process_chat_response(
                                                     load_b64_image_data(line)
                                                 )
                                                 if image_data is not None:
-                                                    image_url = upload_image(
+                                                    image_url = await upload_image(
                                                         request,
                                                         image_data,
                                                         content_type,
@@ -2310,7 +2310,7 @@ async def process_chat_response(
                                                     load_b64_image_data(line)
                                                 )
                                                 if image_data is not None:
-                                                    image_url = upload_image(
+                                                    image_url = await upload_image(
                                                         request,
                                                         image_data,
                                                         content_type,